@@ -5,32 +5,54 @@ Permite llamar desde Tauri/Node via subprocess
 """
 
 import sys
-import json
 import os
 from pathlib import Path
 
+import orjson
+
 # Añadir transcriptor-lib al path
 sys.path.insert(0, str(Path(__file__).parent / "transcriptor-lib"))
 
+# --jit activa los kernels numba; debe decidirse antes de importar transcriptor
+if '--jit' in sys.argv:
+    sys.argv.remove('--jit')
+    os.environ['TRANSCRIPTOR_JIT'] = '1'
+
 from transcriptor import Transcriptor
 
 
+def _emit(data, pretty=False):
+    """
+    Escribe data como JSON (UTF-8) en stdout
+
+    Compacto por defecto (lo consume Tauri); pretty=True lo indenta
+    para salidas pensadas para leerse a mano.
+    """
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    sys.stdout.buffer.write(orjson.dumps(data, option=option) + b'\n')
+    sys.stdout.buffer.flush()
+
+
 def main():
     """
     CLI para transcripción de audio/video
 
     Uso:
         python cli.py transcribe <archivo> [opciones]
+        python cli.py daemon
         python cli.py test_api <api_key>
 
+    Con --jit (en cualquier posición) el post-procesado usa kernels
+    compilados con numba, cacheados en disco entre ejecuciones.
+
     Salida: JSON a stdout
     """
 
     if len(sys.argv) < 2:
-        print(json.dumps({
+        _emit({
             'success': False,
             'error': 'Uso: cli.py <comando> [args]'
-        }))
+        })
         sys.exit(1)
 
     comando = sys.argv[1]
@@ -38,21 +60,23 @@ def main():
     try:
         if comando == 'transcribe':
             transcribe_command()
+        elif comando == 'daemon':
+            daemon_command()
         elif comando == 'test_api':
             test_api_command()
         else:
-            print(json.dumps({
+            _emit({
                 'success': False,
                 'error': f'Comando desconocido: {comando}'
-            }))
+            })
             sys.exit(1)
 
     except Exception as e:
-        print(json.dumps({
+        _emit({
             'success': False,
             'error': str(e),
             'type': type(e).__name__
-        }))
+        })
         sys.exit(1)
 
 
@@ -70,7 +94,7 @@ def transcribe_command():
 
     # Leer configuración desde stdin (JSON)
     if not sys.stdin.isatty():
-        config = json.load(sys.stdin)
+        config = orjson.loads(sys.stdin.buffer.read())
     else:
         # Modo argumentos para testing rápido
         if len(sys.argv) < 4:
@@ -84,21 +108,67 @@ def transcribe_command():
             'prompt': sys.argv[6] if len(sys.argv) > 6 else ''
         }
 
-    # Validar archivo
-    file_path = Path(config['file_path'])
-    if not file_path.exists():
-        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
-
     # Crear transcriptor
+    # Progreso a stderr (verbose): stdout queda solo para el JSON
     trans = Transcriptor(
         api_key=config['api_key'],
-        default_model=config.get('model', 'whisper-large-v3-turbo')
+        default_model=config.get('model', 'whisper-large-v3-turbo'),
+        verbose=True
     )
 
+    # Retornar JSON compacto (orjson serializa directo a bytes UTF-8)
+    _emit(_transcribir(trans, config))
+
+
+def daemon_command():
+    """
+    Modo persistente: una petición JSON por línea en stdin, una respuesta
+    JSON por línea en stdout
+
+    Cada petición lleva los mismos campos que transcribe_command. Se
+    reutiliza un Transcriptor por api_key, y con él sus conexiones HTTP
+    abiertas con Groq, en lugar de pagar un handshake TLS por archivo.
+    """
+    transcriptores = {}
+
+    for line in sys.stdin.buffer:
+        if not line.strip():
+            continue
+
+        try:
+            config = orjson.loads(line)
+
+            trans = transcriptores.get(config['api_key'])
+            if trans is None:
+                # El progreso va a stderr y no se mezcla con las respuestas
+                trans = Transcriptor(api_key=config['api_key'], verbose=True)
+                transcriptores[config['api_key']] = trans
+
+            resultado = _transcribir(trans, config)
+
+        except Exception as e:
+            resultado = {
+                'success': False,
+                'error': str(e),
+                'type': type(e).__name__
+            }
+
+        _emit(resultado)
+
+
+def _transcribir(trans, config):
+    """Transcribe el archivo descrito por config y añade su metadata"""
+
+    # Validar archivo
+    file_path = Path(config['file_path'])
+    if not file_path.exists():
+        raise FileNotFoundError(f"Archivo no encontrado: {file_path}")
+
     # Transcribir
     resultado = trans.transcribir(
         str(file_path),
         language=config.get('language', 'es'),
+        model=config.get('model', 'whisper-large-v3-turbo'),
         prompt=config.get('prompt', ''),
         format='json'
     )
@@ -107,8 +177,7 @@ def transcribe_command():
     resultado['file_name'] = file_path.name
     resultado['file_size_mb'] = file_path.stat().st_size / (1024 * 1024)
 
-    # Retornar JSON
-    print(json.dumps(resultado, ensure_ascii=False, indent=2))
+    return resultado
 
 
 def test_api_command():
@@ -127,17 +196,17 @@ def test_api_command():
         # Intentar crear instancia
         trans = Transcriptor(api_key=api_key)
 
-        print(json.dumps({
+        _emit({
             'success': True,
             'message': 'API key válida',
             'api_key_prefix': api_key[:10] + '...'
-        }))
+        }, pretty=True)
 
     except Exception as e:
-        print(json.dumps({
+        _emit({
             'success': False,
             'error': str(e)
-        }))
+        }, pretty=True)
         sys.exit(1)
 
 
@@ -76,18 +76,16 @@ def crear_formulario(request):
                 'error': 'No se recibió archivo de audio'
             })
 
-        # Crear instancia del transcriptor
-        trans = Transcriptor(
-            api_key=settings.GROQ_API_KEY,
-            default_model=settings.TRANSCRIPTOR_MODEL
-        )
-
         try:
             # Transcribir
-            resultado = trans.transcribir(
-                audio_file,
-                language=settings.TRANSCRIPTOR_DEFAULT_LANGUAGE
-            )
+            with Transcriptor(
+                api_key=settings.GROQ_API_KEY,
+                default_model=settings.TRANSCRIPTOR_MODEL
+            ) as trans:
+                resultado = trans.transcribir(
+                    audio_file,
+                    language=settings.TRANSCRIPTOR_DEFAULT_LANGUAGE
+                )
 
             # Guardar en base de datos
             formulario = Formulario.objects.create(
@@ -119,14 +117,13 @@ def retranscribir(request, pk):
     if not formulario.archivo_audio:
         return redirect('formulario_detalle', pk=pk)
 
-    trans = Transcriptor(api_key=settings.GROQ_API_KEY)
-
     try:
         # Re-transcribir desde el archivo guardado
-        resultado = trans.transcribir(
-            formulario.archivo_audio.path,  # Ruta del archivo en MEDIA
-            language='es'
-        )
+        with Transcriptor(api_key=settings.GROQ_API_KEY) as trans:
+            resultado = trans.transcribir(
+                formulario.archivo_audio.path,  # Ruta del archivo en MEDIA
+                language='es'
+            )
 
         # Actualizar
         formulario.transcripcion = resultado['text']
@@ -236,11 +233,11 @@ from django.conf import settings
 def transcribir_async(formulario_id):
     formulario = Formulario.objects.get(id=formulario_id)
 
-    trans = Transcriptor(api_key=settings.GROQ_API_KEY)
-    resultado = trans.transcribir(
-        formulario.archivo_audio.path,
-        language='es'
-    )
+    with Transcriptor(api_key=settings.GROQ_API_KEY) as trans:
+        resultado = trans.transcribir(
+            formulario.archivo_audio.path,
+            language='es'
+        )
 
     formulario.transcripcion = resultado['text']
     formulario.save()
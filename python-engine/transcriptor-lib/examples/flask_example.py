@@ -3,11 +3,35 @@ Ejemplo de integración con Flask
 Grupo Lada Technologies
 """
 
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context
+from flask.json.provider import JSONProvider
 from transcriptor import Transcriptor
+import orjson
 import os
 
+
+class OrjsonProvider(JSONProvider):
+    """Serializa las respuestas JSON con orjson (más rápido que json)"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def orjson_stream(payload):
+    """Genera el JSON de payload campo por campo, sin armar el cuerpo completo"""
+    yield b'{'
+    for i, (key, value) in enumerate(payload.items()):
+        if i:
+            yield b','
+        yield orjson.dumps(key) + b':' + orjson.dumps(value)
+    yield b'}'
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Configuración
 GROQ_API_KEY = os.getenv('GROQ_API_KEY', 'tu_api_key_aqui')
@@ -27,24 +51,23 @@ def transcribir():
 
     audio_file = request.files['audio']
 
-    # Crear transcriptor
-    trans = Transcriptor(api_key=GROQ_API_KEY)
-
     try:
         # Transcribir directamente del file object
-        resultado = trans.transcribir(
-            audio_file,
-            language=request.form.get('language', 'es'),
-            model=request.form.get('model', 'whisper-large-v3-turbo')
-        )
-
-        return jsonify({
+        with Transcriptor(api_key=GROQ_API_KEY) as trans:
+            resultado = trans.transcribir(
+                audio_file,
+                language=request.form.get('language', 'es'),
+                model=request.form.get('model', 'whisper-large-v3-turbo')
+            )
+
+        # Transcripciones largas: enviar la respuesta por partes
+        return Response(stream_with_context(orjson_stream({
             'success': True,
             'text': resultado['text'],
             'duration': resultado['duration'],
             'model': resultado['model'],
             'chunks': resultado['chunks']
-        })
+        })), mimetype='application/json')
 
     except Exception as e:
         return jsonify({
@@ -67,30 +90,25 @@ def transcribir_y_guardar():
     audio_file = request.files['audio']
     filename = audio_file.filename
 
-    # Guardar archivo
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    audio_file.save(filepath)
-
-    # Transcribir
-    trans = Transcriptor(api_key=GROQ_API_KEY)
-
+    # Transcribir directamente del upload
     try:
-        resultado = trans.transcribir(filepath, language='es')
-
-        return jsonify({
-            'success': True,
-            'text': resultado['text'],
-            'file': filename,
-            'duration': resultado['duration']
-        })
+        with Transcriptor(api_key=GROQ_API_KEY) as trans:
+            resultado = trans.transcribir(audio_file, language='es')
 
     except Exception as e:
-        # Eliminar archivo si falló
-        if os.path.exists(filepath):
-            os.remove(filepath)
-
         return jsonify({'error': str(e)}), 500
 
+    # Guardar archivo solo si la transcripción fue exitosa
+    audio_file.stream.seek(0)
+    audio_file.save(os.path.join(UPLOAD_FOLDER, filename))
+
+    return jsonify({
+        'success': True,
+        'text': resultado['text'],
+        'file': filename,
+        'duration': resultado['duration']
+    })
+
 
 # ========================================
 # 3. RUTA PARA TRANSCRIBIR DESDE URL
@@ -106,13 +124,12 @@ def transcribir_url():
     if not url:
         return jsonify({'error': 'URL no proporcionada'}), 400
 
-    trans = Transcriptor(api_key=GROQ_API_KEY)
-
     try:
-        resultado = trans.transcribir_url(
-            url,
-            language=data.get('language', 'es')
-        )
+        with Transcriptor(api_key=GROQ_API_KEY) as trans:
+            resultado = trans.transcribir_url(
+                url,
+                language=data.get('language', 'es')
+            )
 
         return jsonify({
             'success': True,
@@ -235,10 +252,9 @@ def transcribir_a_db():
 
     audio_file = request.files['audio']
 
-    trans = Transcriptor(api_key=GROQ_API_KEY)
-
     try:
-        resultado = trans.transcribir(audio_file, language='es')
+        with Transcriptor(api_key=GROQ_API_KEY) as trans:
+            resultado = trans.transcribir(audio_file, language='es')
 
         # Guardar en DB
         transcripcion = Transcripcion(
@@ -35,8 +35,20 @@ setup(
     python_requires='>=3.7',
     install_requires=[
         'requests>=2.25.0',
+        'requests-toolbelt>=0.9',
+        'orjson>=3.6',
+        'aiohttp>=3.8',
     ],
     extras_require={
+        'jit': [
+            'numba>=0.56',
+        ],
+        'stream': [
+            'ijson>=3.1',
+        ],
+        'hash': [
+            'xxhash>=3.0',
+        ],
         'dev': [
             'pytest>=6.0',
             'pytest-cov>=2.0',
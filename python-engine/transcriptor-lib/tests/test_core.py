@@ -0,0 +1,321 @@
+"""
+Tests del módulo principal de transcripción
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import threading
+import time
+import wave
+
+import pytest
+
+from transcriptor import Transcriptor, core
+from transcriptor.audio import _FFMPEG
+
+
+requires_ffmpeg = pytest.mark.skipif(
+    shutil.which(_FFMPEG) is None, reason="ffmpeg no disponible"
+)
+
+
+def _wav_silencio(path, seconds):
+    """Escribe un WAV 16kHz mono de silencio"""
+    with wave.open(str(path), 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b'\0\0' * 16000 * seconds)
+
+
+@pytest.fixture
+def transcriptor(monkeypatch):
+    with Transcriptor(api_key='test') as t:
+        # ~1 MB por request: un WAV de 2 minutos ya hay que partirlo
+        t.MAX_FILE_SIZE_MB = 1
+
+        async def fake_call_api_async(session, filepath, form, parse=None):
+            return {'text': 'chunk'}
+
+        monkeypatch.setattr(t, '_call_api_async', fake_call_api_async)
+        yield t
+
+
+@requires_ffmpeg
+def test_transcribir_archivo_grande(transcriptor, tmp_path):
+    audio = tmp_path / 'largo.wav'
+    _wav_silencio(audio, 300)
+
+    result = transcriptor.transcribir(str(audio), format='json')
+
+    assert result['success']
+    assert result['chunks'] > 1
+
+
+@requires_ffmpeg
+def test_transcribir_archivo_grande_desde_loop(transcriptor, tmp_path):
+    # Mismo caso llamado desde un loop ya corriendo (Jupyter, FastAPI...)
+    audio = tmp_path / 'largo.wav'
+    _wav_silencio(audio, 300)
+
+    async def main():
+        return transcriptor.transcribir(str(audio), format='json')
+
+    result = asyncio.run(main())
+
+    assert result['success']
+    assert result['chunks'] > 1
+
+
+@requires_ffmpeg
+def test_transcribir_fileobject_grande_sin_nombre(transcriptor, tmp_path, monkeypatch):
+    # Un BytesIO sin nombre se vuelca a un .tmp, extensión sin muxer en ffmpeg
+    audio = tmp_path / 'largo.wav'
+    _wav_silencio(audio, 300)
+    enviados = []
+
+    async def fake_call_api_async(session, filepath, form, parse=None):
+        enviados.append(os.path.splitext(filepath)[1])
+        return {'text': 'chunk'}
+
+    monkeypatch.setattr(transcriptor, '_call_api_async', fake_call_api_async)
+
+    result = transcriptor.transcribir(io.BytesIO(audio.read_bytes()), format='json')
+
+    assert result['chunks'] > 1
+    assert set(enviados) == {'.wav'}
+
+
+# --- Unión de chunks verbose_json (sin ffmpeg) ---
+
+def _chunks_verbose():
+    """Dos chunks de 240s con 15s compartidos (corte en 232.5s globales)"""
+    return [
+        {'text': 'a b c', 'segments': [
+            {'start': 0.0, 'end': 10.0, 'text': ' a'},
+            {'start': 220.0, 'end': 230.0, 'text': ' b'},
+            {'start': 230.0, 'end': 238.0, 'text': ' c'},
+        ]},
+        # El segundo chunk empieza en 225s: repite b y c
+        {'text': 'b c d', 'segments': [
+            {'start': 0.0, 'end': 5.0, 'text': ' b'},
+            {'start': 5.0, 'end': 13.0, 'text': ' c'},
+            {'start': 20.0, 'end': 30.0, 'text': ' d'},
+        ]},
+    ]
+
+
+@pytest.fixture(params=['python', 'jit'])
+def kernels(request, monkeypatch):
+    """Corre el test con los kernels como Python sobre listas y compilados con numba"""
+    split_timestamps = getattr(core._split_timestamps, 'py_func', core._split_timestamps)
+    merge_overlaps = getattr(core._merge_overlaps, 'py_func', core._merge_overlaps)
+
+    if request.param == 'jit':
+        numba = pytest.importorskip('numba')
+        np = pytest.importorskip('numpy')
+        split_timestamps = numba.njit(split_timestamps)
+        merge_overlaps = numba.njit(merge_overlaps)
+    else:
+        np = None
+
+    monkeypatch.setattr(core, 'np', np)
+    monkeypatch.setattr(core, '_split_timestamps', split_timestamps)
+    monkeypatch.setattr(core, '_merge_overlaps', merge_overlaps)
+    return request.param
+
+
+def test_unir_chunks_segmentos_del_overlap_una_vez(transcriptor, kernels):
+    text = transcriptor._unir_chunks(_chunks_verbose(), 'verbose_json')
+
+    lines = text.split('=== SEGMENTOS CON TIMESTAMPS ===')[1].strip().splitlines()
+    assert lines == [
+        '[00:00 - 00:10] a',
+        '[03:40 - 03:50] b',
+        '[03:50 - 03:58] c',
+        '[04:05 - 04:15] d',
+    ]
+
+
+def test_unir_chunks_vacio(transcriptor, kernels):
+    text = transcriptor._unir_chunks([], 'verbose_json')
+
+    assert text.endswith('=== SEGMENTOS CON TIMESTAMPS ===\n')
+
+
+def test_unir_chunks_un_solo_chunk(transcriptor, kernels):
+    chunk = _chunks_verbose()[0]
+
+    assert transcriptor._unir_chunks([chunk], 'verbose_json') == \
+        transcriptor._format_verbose({'text': 'a b c', 'segments': chunk['segments']})
+
+
+def test_unir_chunks_jit_igual_que_python(transcriptor, monkeypatch):
+    numba = pytest.importorskip('numba')
+    np = pytest.importorskip('numpy')
+    split_timestamps = getattr(core._split_timestamps, 'py_func', core._split_timestamps)
+    merge_overlaps = getattr(core._merge_overlaps, 'py_func', core._merge_overlaps)
+
+    monkeypatch.setattr(core, 'np', None)
+    monkeypatch.setattr(core, '_split_timestamps', split_timestamps)
+    monkeypatch.setattr(core, '_merge_overlaps', merge_overlaps)
+    esperado = transcriptor._unir_chunks(_chunks_verbose(), 'verbose_json')
+
+    monkeypatch.setattr(core, 'np', np)
+    monkeypatch.setattr(core, '_split_timestamps', numba.njit(split_timestamps))
+    monkeypatch.setattr(core, '_merge_overlaps', numba.njit(merge_overlaps))
+
+    assert transcriptor._unir_chunks(_chunks_verbose(), 'verbose_json') == esperado
+
+
+def test_unir_chunks_texto(transcriptor):
+    results = iter([{'text': 'uno'}, {'text': 'dos'}])
+
+    assert transcriptor._unir_chunks(results, 'json') == 'uno\n\ndos'
+
+
+def test_verbose_builder():
+    ijson = pytest.importorskip('ijson')
+    raw = (
+        b'{"task": "transcribe", "text": "hola mundo", "segments": ['
+        b'{"id": 0, "start": 0.0, "end": 1.5, "text": " hola", "tokens": [1, 2]},'
+        b'{"id": 1, "start": 1.5, "end": 3, "text": " mundo", "avg_logprob": -0.2}'
+        b']}'
+    )
+
+    builder = core._VerboseBuilder()
+    for event in ijson.parse(io.BytesIO(raw)):
+        builder.feed(*event)
+
+    assert builder.result() == {
+        'text': 'hola mundo',
+        'segments': [
+            {'start': 0.0, 'end': 1.5, 'text': ' hola'},
+            {'start': 1.5, 'end': 3.0, 'text': ' mundo'},
+        ]
+    }
+
+
+# --- Reintentos ante 429/5xx (sin red) ---
+
+class _Respuesta:
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode()
+        self.headers = headers or {}
+
+
+class _Pipe(io.BytesIO):
+    """Como el stdout de ffmpeg: no se puede rebobinar"""
+
+    def seekable(self):
+        return False
+
+
+def test_retry_delay():
+    assert core._retry_delay(0, '3') == 3.0
+    assert core._retry_delay(0, '600') == 60.0
+    assert 1 <= core._retry_delay(0, None) < 2
+    assert 60 <= core._retry_delay(10, 'Wed, 21 Oct 2026 07:28:00 GMT') < 61
+
+
+def test_reintenta_429_rebobinando_el_archivo(transcriptor, monkeypatch):
+    respuestas = iter([
+        _Respuesta(429, b'rate limit', {'Retry-After': '0'}),
+        _Respuesta(200, b'{"text": "hola"}'),
+    ])
+    enviados = []
+
+    def fake_post(audio_file, filename, form, stream=False):
+        enviados.append(audio_file.read())
+        return next(respuestas)
+
+    monkeypatch.setattr(transcriptor, '_post', fake_post)
+    audio = io.BytesIO(b'cabecera audio')
+    audio.seek(9)
+
+    text = transcriptor._call_api_fileobj(
+        audio, 'audio.mp3', {'response_format': 'json'}, transcriptor._parser('json')
+    )
+
+    assert text == 'hola'
+    assert enviados == [b'audio', b'audio']
+
+
+def test_no_reintenta_pipes(transcriptor, monkeypatch):
+    enviados = []
+
+    def fake_post(audio_file, filename, form, stream=False):
+        enviados.append(audio_file.read())
+        return _Respuesta(429, b'rate limit', {'Retry-After': '0'})
+
+    monkeypatch.setattr(transcriptor, '_post', fake_post)
+
+    with pytest.raises(Exception, match='429'):
+        transcriptor._call_api_fileobj(
+            _Pipe(b'audio'), 'chunk.wav', {'response_format': 'json'}
+        )
+    assert enviados == [b'audio']
+
+
+# --- Copia de uploads a disco ---
+
+def test_copiar_bytesio(transcriptor, tmp_path):
+    src = io.BytesIO(b'x' * 100000)
+
+    with open(tmp_path / 'dst', 'wb') as dst:
+        transcriptor._copiar(src, dst)
+
+    assert (tmp_path / 'dst').read_bytes() == b'x' * 100000
+
+
+def test_copiar_archivo_real(transcriptor, tmp_path):
+    (tmp_path / 'src').write_bytes(b'cabecera' + b'y' * 100000)
+
+    with open(tmp_path / 'src', 'rb') as src, open(tmp_path / 'dst', 'wb') as dst:
+        src.seek(8)
+        transcriptor._copiar(src, dst)
+        assert src.tell() == 8 + 100000
+
+    assert (tmp_path / 'dst').read_bytes() == b'y' * 100000
+
+
+def test_close_libera_pool_y_sesion(monkeypatch):
+    t = Transcriptor(api_key='test')
+    cerradas = []
+    monkeypatch.setattr(t._session, 'close', lambda: cerradas.append(True))
+
+    with t:
+        pass
+
+    with pytest.raises(RuntimeError):
+        t._pool.submit(print)
+    assert cerradas == [True]
+
+
+def test_transcribir_muchos_acota_las_subidas(transcriptor, monkeypatch):
+    lock = threading.Lock()
+    en_curso = []
+    pico = []
+
+    def fake_transcribir(archivo, language='es', model=None, prompt='', format='json',
+                         chunk_if_needed=True, max_concurrency=8):
+        with lock:
+            en_curso.append(max_concurrency)
+            pico.append(sum(en_curso))
+        time.sleep(0.05)
+        with lock:
+            en_curso.remove(max_concurrency)
+        return {'text': archivo}
+
+    monkeypatch.setattr(transcriptor, 'transcribir', fake_transcribir)
+
+    results = transcriptor.transcribir_muchos(
+        ['a', 'b', 'c', 'd', 'e'], max_files=4, max_concurrency=2
+    )
+
+    assert [r['text'] for r in results] == ['a', 'b', 'c', 'd', 'e']
+    assert max(pico) <= 2
@@ -2,23 +2,252 @@
 Módulo de procesamiento de audio y video
 """
 
+import asyncio
 import subprocess
 import os
+import re
+import json
+import glob
+import shutil
 import tempfile
 import math
-from pathlib import Path
+import functools
+import hashlib
+import logging
+import mmap
+import threading
+import wave
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+try:
+    import xxhash
+    _new_hash = xxhash.xxh3_64
+except ImportError:
+    # Sin xxhash: blake2b, más lento pero en la stdlib (y solo son 128 KiB)
+    def _new_hash():
+        return hashlib.blake2b(digest_size=16)
+
+logger = logging.getLogger(__name__)
+
+# Binarios resueltos una sola vez: FFMPEG_BIN / FFPROBE_BIN permiten usar
+# un ffmpeg empaquetado con la app; si no, se busca en el PATH
+_FFMPEG = os.environ.get('FFMPEG_BIN') or shutil.which('ffmpeg') or 'ffmpeg'
+_FFPROBE = os.environ.get('FFPROBE_BIN') or shutil.which('ffprobe') or 'ffprobe'
+
+# Línea "Duration: HH:MM:SS.xx" que ffmpeg imprime al abrir la entrada
+_DURATION_RE = re.compile(r'Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+
+# Argumentos de codec para los chunks: copia del audio original, o WAV
+# 16kHz mono (formato nativo de Whisper) al partir desde un video
+_COPY_AUDIO = ['-vn', '-acodec', 'copy']
+_WAV_16K_MONO = ['-vn', '-acodec', 'pcm_s16le', '-ar', '16000', '-ac', '1']
+
+
+def _silent_unlink(path):
+    """Elimina path si existe (un solo syscall, sin carrera exists/remove)"""
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _run_sync(coro):
+    """
+    Ejecuta una corrutina desde código síncrono
+
+    asyncio.run() falla si el hilo ya tiene un loop corriendo (Jupyter,
+    FastAPI...); en ese caso la corrutina corre en su propio hilo. Es un
+    hilo nuevo y no el pool del transcriptor, que podría estar lleno
+    esperando justamente esta llamada.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# Metadata de ffprobe por firma de contenido (ver _file_signature), LRU
+_PROBE_CACHE_SIZE = 512
+_probe_cache = OrderedDict()
+_probe_lock = threading.Lock()
+
+# Bytes del inicio y del final del archivo que entran en la firma
+_SIGNATURE_BLOCK = 64 * 1024
+
+
+def _file_signature(path, size):
+    """
+    Firma barata del contenido: hash del primer y último bloque de 64 KiB
+
+    Se lee con mmap (solo se tocan esas páginas, no el archivo entero), así
+    que el costo no depende del tamaño. Sobrevive a renombres y copias, como
+    los temporales de uploads y descargas del mismo archivo.
+    """
+    if not size:
+        return b''
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        h = _new_hash()
+        h.update(mm[:_SIGNATURE_BLOCK])
+        if size > _SIGNATURE_BLOCK:
+            h.update(mm[-_SIGNATURE_BLOCK:])
+        return h.digest()
+
+
+def _probe_key(path, size):
+    """Clave del cache de probe para path, None si no se puede leer la firma"""
+    try:
+        return (_file_signature(path, size), size)
+    except (OSError, ValueError):
+        return None
+
+
+def _probe_lookup(key):
+    """Metadata cacheada para key, None si no está"""
+    if key is None:
+        return None
+    with _probe_lock:
+        if key in _probe_cache:
+            _probe_cache.move_to_end(key)
+            return _probe_cache[key]
+    return None
+
+
+def _probe_store(key, info):
+    """Guarda info en el cache de probe (descartando la entrada más vieja)"""
+    if key is None:
+        return
+    with _probe_lock:
+        _probe_cache[key] = info
+        if len(_probe_cache) > _PROBE_CACHE_SIZE:
+            _probe_cache.popitem(last=False)
+
+
+def _probe_cached(path, size, cached_only=False):
+    """
+    _probe con cache por (firma, tamaño) en lugar de por ruta
+
+    Con cached_only=True no lanza ffprobe: devuelve None si no está en cache.
+    """
+    key = _probe_key(path, size)
+    info = _probe_lookup(key)
+    if info is not None or cached_only:
+        return info
+
+    info = _probe(path)
+    _probe_store(key, info)
+    return info
+
+
+def _probe_cmd(path):
+    """Comando de ffprobe que lee toda la metadata que usa AudioProcessor"""
+    return [
+        _FFPROBE, '-v', 'error',
+        '-show_entries',
+        'format=duration,format_name'
+        ':stream=codec_type,codec_name,sample_rate,channels'
+        ':stream_disposition=attached_pic',
+        '-of', 'json',
+        path
+    ]
+
+
+def _probe(path):
+    """
+    Lee con un solo ffprobe toda la metadata que usa AudioProcessor
+
+    Returns:
+        dict: 'duration' (float o None), 'has_video' (bool) y 'audio_spec'
+            (formato de WAV_SPEC, None si no hay audio); None si ffprobe falla
+    """
+    try:
+        result = subprocess.run(
+            _probe_cmd(path),
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+
+    return _parse_probe(result.stdout)
+
+
+def _parse_probe(stdout):
+    """Arma el dict de _probe a partir del JSON de ffprobe, None si no es válido"""
+    try:
+        info = json.loads(stdout)
+    except ValueError:
+        return None
+
+    fmt = info.get('format', {})
+    streams = info.get('streams', [])
+
+    try:
+        duration = float(fmt['duration'])
+    except (KeyError, TypeError, ValueError):
+        duration = None
+
+    audio = next((st for st in streams if st.get('codec_type') == 'audio'), None)
+
+    return {
+        'duration': duration,
+        # Las carátulas de mp3/m4a aparecen como stream de video
+        'has_video': any(
+            st.get('codec_type') == 'video'
+            and not st.get('disposition', {}).get('attached_pic')
+            for st in streams
+        ),
+        'audio_spec': audio and {
+            'format_name': fmt.get('format_name'),
+            'codec_name': audio.get('codec_name'),
+            'sample_rate': audio.get('sample_rate'),
+            'channels': audio.get('channels')
+        }
+    }
+
+
+def _parse_duration(stderr):
+    """Extrae la duración en segundos del stderr de ffmpeg, None si no aparece"""
+    match = _DURATION_RE.search(stderr)
+    if not match:
+        return None
+
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
 
 class AudioProcessor:
     """Procesador de archivos de audio y video"""
 
-    VIDEO_EXTENSIONS = {
+    VIDEO_EXTENSIONS = frozenset({
         '.mp4', '.mov', '.avi', '.mkv', '.webm',
         '.flv', '.wmv', '.m4v', '.mpg', '.mpeg'
-    }
+    })
 
-    AUDIO_EXTENSIONS = {
+    AUDIO_EXTENSIONS = frozenset({
         '.mp3', '.wav', '.m4a', '.flac', '.ogg',
         '.aac', '.wma', '.opus'
+    })
+
+    # Formato que produce convert_to_wav (según _audio_spec)
+    WAV_SPEC = {
+        'format_name': 'wav',
+        'codec_name': 'pcm_s16le',
+        'sample_rate': '16000',
+        'channels': 1
+    }
+
+    # Codecs que Groq acepta tal cual, con el contenedor donde los copia remux_audio
+    REMUX_FORMATS = {
+        'aac': '.m4a',
+        'mp3': '.mp3',
+        'opus': '.ogg',
+        'flac': '.flac'
     }
 
     def is_video(self, filepath):
@@ -31,7 +260,7 @@ class AudioProcessor:
         Returns:
             bool: True si es video
         """
-        ext = Path(filepath).suffix.lower()
+        ext = os.path.splitext(os.fspath(filepath))[1].lower()
         return ext in self.VIDEO_EXTENSIONS
 
     def is_audio(self, filepath):
@@ -44,39 +273,184 @@ class AudioProcessor:
         Returns:
             bool: True si es audio
         """
-        ext = Path(filepath).suffix.lower()
+        ext = os.path.splitext(os.fspath(filepath))[1].lower()
         return ext in self.AUDIO_EXTENSIONS
 
-    def get_duration(self, filepath):
+    def probe(self, filepath, st=None):
+        """
+        Obtiene la metadata de un archivo (cacheada por firma de contenido)
+
+        Args:
+            filepath: Ruta del archivo
+            st: os.stat_result del archivo si ya se tiene (evita otro stat)
+
+        Returns:
+            dict: duration, has_video y audio_spec (ver _probe), None si falla
+        """
+        path = os.fspath(filepath)
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        return _probe_cached(path, st.st_size)
+
+    def get_duration(self, filepath, st=None):
         """
         Obtiene la duración de un archivo de audio/video
 
         Args:
             filepath: Ruta del archivo
+            st: os.stat_result del archivo si ya se tiene (ver probe)
 
         Returns:
             float: Duración en segundos, None si falla
         """
+        info = self.probe(filepath, st)
+        if info is None or info['duration'] is None:
+            logger.warning(f"⚠️ No se pudo obtener duración de {os.fspath(filepath)}")
+            return None
+        return info['duration']
+
+    def peek_duration(self, filepath, st=None):
+        """
+        Obtiene la duración sin lanzar ffprobe
+
+        Se lee del header si es un WAV PCM, o del cache de probe si el
+        archivo ya se analizó antes.
+
+        Args:
+            filepath: Ruta del archivo
+            st: os.stat_result del archivo si ya se tiene (ver probe)
+
+        Returns:
+            float: Duración en segundos, None si no se conoce sin ffprobe
+        """
+        path = os.fspath(filepath)
+        if path.lower().endswith('.wav'):
+            try:
+                with wave.open(path, 'rb') as w:
+                    return w.getnframes() / w.getframerate()
+            except (wave.Error, EOFError, OSError, ZeroDivisionError):
+                pass
+
+        if st is None:
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+        info = _probe_cached(path, st.st_size, cached_only=True)
+        return info['duration'] if info else None
+
+    @contextmanager
+    def duration_in_background(self, filepath, st=None):
+        """
+        Obtiene la duración con un ffprobe que corre durante el bloque with
+
+        ffprobe es un proceso aparte (no ocupa un hilo) y recién se espera
+        al llamar a la función entregada, así que puede correr mientras se
+        sube el archivo. Si peek_duration ya la conoce no se lanza nada.
+
+        Args:
+            filepath: Ruta del archivo
+            st: os.stat_result del archivo si ya se tiene (ver probe)
+
+        Yields:
+            callable: Sin argumentos; devuelve la duración en segundos o None
+        """
+        path = os.fspath(filepath)
+        if st is None:
+            st = os.stat(path)
+
+        duration = self.peek_duration(path, st)
+        if duration is not None:
+            yield lambda: duration
+            return
+
+        key = _probe_key(path, st.st_size)
+        try:
+            proc = subprocess.Popen(
+                _probe_cmd(path),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except OSError:
+            proc = None
+
+        def wait():
+            info = None
+            if proc is not None:
+                stdout, _ = proc.communicate()
+                if proc.returncode == 0:
+                    info = _parse_probe(stdout)
+                    _probe_store(key, info)
+            if info is None or info['duration'] is None:
+                logger.warning(f"⚠️ No se pudo obtener duración de {path}")
+                return None
+            return info['duration']
+
+        try:
+            yield wait
+        finally:
+            if proc is not None and proc.poll() is None:
+                proc.kill()
+                proc.communicate()
+
+    def remux_audio(self, video_path, output_path=None):
+        """
+        Copia la pista de audio de un video a un archivo de audio, sin recodificar
+
+        Solo sirve si el codec del audio está en REMUX_FORMATS; si no,
+        usar extract_audio.
+
+        Args:
+            video_path: Ruta del video
+            output_path: Ruta de salida (opcional)
+
+        Returns:
+            str: Ruta del archivo de audio
+
+        Raises:
+            Exception: Si el codec no se puede copiar o ffmpeg falla
+        """
+        info = self.probe(video_path) or {}
+        codec = (info.get('audio_spec') or {}).get('codec_name')
+        suffix = self.REMUX_FORMATS.get(codec)
+        if suffix is None:
+            raise Exception(f"Error copiando audio: codec no soportado ({codec})")
+
+        if output_path is None:
+            tmp = tempfile.NamedTemporaryFile(
+                delete=False,
+                suffix=suffix
+            )
+            output_path = tmp.name
+            tmp.close()
+
         try:
             cmd = [
-                'ffprobe', '-v', 'error',
-                '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1',
-                str(filepath)
+                _FFMPEG, '-loglevel', 'error',
+                '-i', str(video_path),
+                '-map', '0:a:0',  # Solo la primera pista de audio
+                '-c:a', 'copy',  # Sin recodificar
+                '-y',
+                output_path
             ]
 
-            result = subprocess.run(
+            subprocess.run(
                 cmd,
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 check=True
             )
 
-            return float(result.stdout.strip())
+            return output_path
 
-        except Exception as e:
-            print(f"⚠️ No se pudo obtener duración: {e}")
-            return None
+        except subprocess.CalledProcessError as e:
+            _silent_unlink(output_path)
+
+            raise Exception(f"Error copiando audio: {e.stderr.decode()}")
 
     def extract_audio(self, video_path, output_path=None):
         """
@@ -103,7 +477,8 @@ class AudioProcessor:
 
         try:
             cmd = [
-                'ffmpeg', '-i', str(video_path),
+                _FFMPEG, '-loglevel', 'error',
+                '-i', str(video_path),
                 '-vn',  # Sin video
                 '-acodec', 'pcm_s16le',  # WAV codec
                 '-ar', '16000',  # 16kHz (óptimo para Whisper)
@@ -114,7 +489,8 @@ class AudioProcessor:
 
             subprocess.run(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 check=True
             )
 
@@ -122,67 +498,348 @@ class AudioProcessor:
 
         except subprocess.CalledProcessError as e:
             # Limpiar archivo temporal si falló
-            if os.path.exists(output_path):
-                os.remove(output_path)
+            _silent_unlink(output_path)
 
             raise Exception(f"Error extrayendo audio: {e.stderr.decode()}")
 
-    def create_chunks(self, audio_path, chunk_duration=240, overlap=15):
+    def create_chunks(self, audio_path, chunk_duration=240, overlap=15, duration=None,
+                      tmpdir=None):
         """
         Divide un archivo de audio en chunks
 
+        Sin overlap se usa el segment muxer de ffmpeg, que genera todos los
+        chunks en una sola pasada sobre la entrada. El segment muxer no
+        admite segmentos solapados, así que con overlap se corta cada
+        ventana por separado (con seek en la entrada, sin releer el inicio).
+
         Args:
             audio_path: Ruta del audio
             chunk_duration: Duración de cada chunk en segundos (default: 4min)
             overlap: Segundos de overlap entre chunks (default: 15s)
+            duration: Duración del audio si ya se conoce (evita ffprobe)
+            tmpdir: Directorio donde escribir los chunks (ej: el de un
+                tempfile.TemporaryDirectory). Si es None se crea uno que
+                queda a cargo de quien llama
 
         Returns:
             list: Lista de rutas de los chunks creados
         """
-        duration = self.get_duration(audio_path)
-        if not duration:
-            # Si no podemos obtener duración, retornar archivo original
-            return [str(audio_path)]
+        chunks, _ = self._split(
+            audio_path,
+            _COPY_AUDIO,
+            self._chunk_suffix(audio_path),
+            chunk_duration, overlap, duration, tmpdir
+        )
+        return chunks
 
-        chunks = []
-        num_chunks = math.ceil(duration / (chunk_duration - overlap))
+    async def create_chunks_async(self, audio_path, chunk_duration=240, overlap=15,
+                                  duration=None, tmpdir=None, info=None):
+        """
+        Versión asíncrona de create_chunks que entrega cada chunk apenas existe
 
-        for i in range(num_chunks):
-            start_time = i * (chunk_duration - overlap)
-            end_time = min(start_time + chunk_duration, duration)
+        Permite empezar a enviar los primeros chunks mientras ffmpeg sigue
+        cortando el resto. Mismos argumentos que create_chunks, más info: un
+        dict opcional donde queda 'duration' al terminar (sin ffprobe extra
+        si no se conocía y no hay overlap).
 
-            # Crear chunk
-            chunk_tmp = tempfile.NamedTemporaryFile(
-                delete=False,
-                suffix=f'_chunk_{i}.wav'
-            )
-            chunk_path = chunk_tmp.name
-            chunk_tmp.close()
+        Yields:
+            tuple: (índice, ruta del chunk), en orden
+        """
+        async for item in self._split_async(
+            audio_path,
+            _COPY_AUDIO,
+            self._chunk_suffix(audio_path),
+            chunk_duration, overlap, duration, tmpdir, info
+        ):
+            yield item
+
+    def _chunk_suffix(self, audio_path):
+        """
+        Extensión de los chunks al copiar el audio sin recodificar
+
+        Se conserva la de la entrada si es un formato de audio conocido; si
+        no (ej: .tmp de un upload sin nombre) ffmpeg no tendría muxer para
+        ella, así que se elige por el codec, o WAV como antes.
+        """
+        ext = os.path.splitext(os.fspath(audio_path))[1].lower()
+        if ext in self.AUDIO_EXTENSIONS:
+            return ext
+
+        spec = self._audio_spec(audio_path) or {}
+        return self.REMUX_FORMATS.get(spec.get('codec_name'), '.wav')
+
+    def extract_and_chunk(self, video_path, chunk_duration=240, overlap=15, duration=None,
+                          tmpdir=None):
+        """
+        Extrae el audio de un video directamente en chunks WAV
+
+        Equivale a extract_audio + create_chunks, pero decodifica el video
+        una sola vez y no escribe el WAV intermedio completo.
+
+        Args:
+            video_path: Ruta del video
+            chunk_duration: Duración de cada chunk en segundos (default: 4min)
+            overlap: Segundos de overlap entre chunks (default: 15s)
+            duration: Duración del video si ya se conoce (evita ffprobe)
+            tmpdir: Directorio donde escribir los chunks (ver create_chunks)
+
+        Returns:
+            tuple: (lista de rutas de los chunks WAV 16kHz mono,
+                    duración del video en segundos o None)
+        """
+        return self._split(
+            video_path, _WAV_16K_MONO, '.wav',
+            chunk_duration, overlap, duration, tmpdir
+        )
+
+    async def extract_and_chunk_async(self, video_path, chunk_duration=240, overlap=15,
+                                      duration=None, tmpdir=None, info=None):
+        """
+        Versión asíncrona de extract_and_chunk (ver create_chunks_async)
+
+        Yields:
+            tuple: (índice, ruta del chunk WAV 16kHz mono), en orden
+        """
+        async for item in self._split_async(
+            video_path, _WAV_16K_MONO, '.wav',
+            chunk_duration, overlap, duration, tmpdir, info
+        ):
+            yield item
+
+    def _split(self, input_path, codec_args, suffix, chunk_duration, overlap, duration,
+               tmpdir):
+        """
+        Corta input_path en chunks con los argumentos de codec dados
+
+        Versión síncrona de _split_async: junta todos los chunks en una lista.
+
+        Returns:
+            tuple: (rutas de los chunks, duración de la entrada)
+        """
+        info = {'duration': duration}
+
+        async def juntar():
+            return [
+                chunk_path async for _, chunk_path in self._split_async(
+                    input_path, codec_args, suffix, chunk_duration, overlap,
+                    duration, tmpdir, info
+                )
+            ]
+
+        chunks = _run_sync(juntar())
+        return chunks, info['duration']
+
+    async def _split_async(self, input_path, codec_args, suffix, chunk_duration, overlap,
+                           duration, tmpdir, info=None):
+        """
+        Corta input_path en chunks y entrega (índice, ruta) apenas se termina cada uno
+
+        Sin overlap se usa el segment muxer de ffmpeg, en una sola pasada; con
+        overlap se corta cada ventana con su propio ffmpeg, en paralelo.
+
+        Args:
+            info: dict opcional donde queda 'duration', la de la entrada (la
+                que imprime ffmpeg al abrirla si no se conocía), al terminar
+        """
+        input_path = os.fspath(input_path)
+        if info is None:
+            info = {}
+        info['duration'] = duration
+
+        owns_tmpdir = tmpdir is None
+
+        if not overlap:
+            if owns_tmpdir:
+                tmpdir = tempfile.mkdtemp(prefix='transcriptor_')
 
             cmd = [
-                'ffmpeg', '-i', str(audio_path),
-                '-ss', str(start_time),
-                '-t', str(end_time - start_time),
-                '-acodec', 'copy',
+                # -nostats en lugar de -loglevel error: se necesita la
+                # línea "Duration:" del stderr, no el progreso
+                _FFMPEG, '-hide_banner', '-nostats',
+                '-i', input_path,
+                *codec_args,
+                '-f', 'segment',
+                '-segment_time', str(chunk_duration),
+                '-reset_timestamps', '1',
+                # Escribe en stdout el nombre de cada segmento al cerrarlo
+                '-segment_list', 'pipe:1',
+                '-segment_list_type', 'flat',
                 '-y',
-                chunk_path
+                os.path.join(tmpdir, f'chunk_%04d{suffix}')
             ]
 
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            # stderr se lee en paralelo para que no se llene el pipe
+            stderr_task = asyncio.ensure_future(proc.stderr.read())
             try:
-                subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    check=True
-                )
-                chunks.append(chunk_path)
+                index = 0
+                async for line in proc.stdout:
+                    name = line.decode().strip()
+                    if name:
+                        yield index, os.path.join(tmpdir, name)
+                        index += 1
+                stderr = (await stderr_task).decode(errors='replace')
+                await proc.wait()
+            finally:
+                stderr_task.cancel()
+                if proc.returncode is None:
+                    proc.kill()
+                    await proc.wait()
+
+            if proc.returncode != 0:
+                if owns_tmpdir:
+                    shutil.rmtree(tmpdir, ignore_errors=True)
+                raise Exception(f"Error dividiendo audio: {stderr}")
+
+            if duration is None:
+                # ffmpeg ya imprimió la duración al abrir la entrada
+                info['duration'] = _parse_duration(stderr)
+            return
+
+        if duration is None:
+            duration = info['duration'] = self.get_duration(input_path)
+        if not duration:
+            # Si no podemos obtener duración, entregar archivo original
+            yield 0, input_path
+            return
+
+        if owns_tmpdir:
+            tmpdir = tempfile.mkdtemp(prefix='transcriptor_')
+        windows = self.chunk_windows(duration, chunk_duration, overlap)
+
+        # Todas las ventanas se cortan en paralelo; se entregan en orden
+        semaphore = asyncio.Semaphore(os.cpu_count() or 1)
+        tasks = [
+            asyncio.ensure_future(self._cut_window(
+                semaphore, input_path, codec_args, suffix, tmpdir, i, start_time, length
+            ))
+            for i, (start_time, length) in enumerate(windows)
+        ]
+        try:
+            for i, task in enumerate(tasks):
+                chunk_path = await task
+                if chunk_path is None:
+                    if owns_tmpdir:
+                        shutil.rmtree(tmpdir, ignore_errors=True)
+                    raise Exception(f"Error dividiendo audio: no se pudo crear el chunk {i}")
+                yield i, chunk_path
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _cut_window(self, semaphore, input_path, codec_args, suffix, tmpdir,
+                          i, start_time, length):
+        """
+        Corta una ventana con su propio ffmpeg (hasta un proceso por núcleo)
 
-            except subprocess.CalledProcessError as e:
-                print(f"⚠️ Error creando chunk {i}: {e}")
-                # Eliminar chunk fallido
-                if os.path.exists(chunk_path):
-                    os.remove(chunk_path)
+        Returns:
+            str: Ruta del chunk, o None si falló
+        """
+        chunk_path = os.path.join(tmpdir, f'chunk_{i:04d}{suffix}')
+
+        cmd = [
+            _FFMPEG, '-loglevel', 'error',
+            '-ss', str(start_time),
+            '-i', input_path,
+            '-t', str(length),
+            *codec_args,
+            '-y',
+            chunk_path
+        ]
+
+        async with semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            _, stderr = await proc.communicate()
 
-        return chunks
+        if proc.returncode != 0:
+            logger.warning(f"⚠️ Error creando chunk {i}: {stderr.decode(errors='replace').strip()}")
+            # Eliminar chunk fallido
+            _silent_unlink(chunk_path)
+            return None
+
+        return chunk_path
+
+    def chunk_windows(self, duration, chunk_duration=240, overlap=15):
+        """
+        Calcula las ventanas en que se divide un audio
+
+        Args:
+            duration: Duración del audio en segundos
+            chunk_duration: Duración de cada chunk en segundos (default: 4min)
+            overlap: Segundos de overlap entre chunks (default: 15s)
+
+        Returns:
+            list: Tuplas (inicio, duración) en segundos
+        """
+        step = chunk_duration - overlap
+        num_chunks = max(1, math.ceil((duration - overlap) / step))
+
+        return [
+            (i * step, min(chunk_duration, duration - i * step))
+            for i in range(num_chunks)
+        ]
+
+    @contextmanager
+    def stream_chunk(self, input_path, start, duration):
+        """
+        Decodifica una ventana del audio a WAV 16kHz mono por un pipe
+
+        El chunk nunca se escribe en disco: ffmpeg lo entrega por stdout y
+        quien lo consume lo lee directamente del pipe.
+
+        Args:
+            input_path: Ruta del audio o video
+            start: Inicio de la ventana en segundos
+            duration: Duración de la ventana en segundos
+
+        Yields:
+            file: Pipe binario de solo lectura con el WAV
+
+        Raises:
+            Exception: Si ffmpeg falla
+        """
+        cmd = [
+            _FFMPEG, '-loglevel', 'error',
+            '-ss', str(start),
+            '-i', str(input_path),
+            '-t', str(duration),
+            '-vn',
+            '-acodec', 'pcm_s16le',
+            '-ar', '16000',
+            '-ac', '1',
+            '-f', 'wav',
+            'pipe:1'
+        ]
+
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+
+        try:
+            yield proc.stdout
+
+        except BaseException:
+            proc.kill()
+            raise
+
+        finally:
+            proc.stdout.close()
+            stderr = proc.stderr.read()
+            proc.stderr.close()
+            returncode = proc.wait()
+
+        if returncode != 0:
+            raise Exception(f"Error extrayendo chunk: {stderr.decode()}")
 
     def convert_to_wav(self, input_path, output_path=None):
         """
@@ -203,9 +860,16 @@ class AudioProcessor:
             output_path = tmp.name
             tmp.close()
 
+        spec = self._audio_spec(input_path)
+        if spec == self.WAV_SPEC:
+            # Ya es WAV 16kHz mono: copiar sin decodificar ni recodificar
+            shutil.copyfile(input_path, output_path)
+            return output_path
+
         try:
             cmd = [
-                'ffmpeg', '-i', str(input_path),
+                _FFMPEG, '-loglevel', 'error',
+                '-i', str(input_path),
                 '-acodec', 'pcm_s16le',
                 '-ar', '16000',  # 16kHz
                 '-ac', '1',  # Mono
@@ -215,22 +879,34 @@ class AudioProcessor:
 
             subprocess.run(
                 cmd,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 check=True
             )
 
             return output_path
 
         except subprocess.CalledProcessError as e:
-            if os.path.exists(output_path):
-                os.remove(output_path)
+            _silent_unlink(output_path)
 
             raise Exception(f"Error convirtiendo audio: {e.stderr.decode()}")
 
+    def _audio_spec(self, filepath):
+        """
+        Obtiene contenedor, codec, sample rate y canales del primer stream
+        de audio (mismo formato que WAV_SPEC)
+
+        Returns:
+            dict: Especificación del audio, None si ffprobe falla
+        """
+        info = self.probe(filepath)
+        return info and info['audio_spec']
+
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def check_ffmpeg():
         """
-        Verifica si ffmpeg está instalado
+        Verifica si ffmpeg está instalado (el resultado se cachea)
 
         Returns:
             bool: True si ffmpeg está disponible
@@ -240,8 +916,9 @@ class AudioProcessor:
         """
         try:
             subprocess.run(
-                ['ffmpeg', '-version'],
-                capture_output=True,
+                [_FFMPEG, '-version'],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
                 check=True
             )
             return True
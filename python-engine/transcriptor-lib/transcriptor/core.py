@@ -2,11 +2,176 @@
 Módulo principal de transcripción
 """
 
+import asyncio
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+import atexit
+import contextlib
+import functools
+import io
+import logging
 import os
+import queue
+import random
+import sys
+import time
+import shutil
+import mimetypes
 import tempfile
-from pathlib import Path
-from .audio import AudioProcessor
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter, methodcaller
+from logging.handlers import QueueHandler, QueueListener
+from .audio import AudioProcessor, _run_sync, _silent_unlink
+
+logger = logging.getLogger(__name__)
+
+try:
+    import ijson
+except ImportError:
+    # Sin ijson las respuestas verbose_json se cargan enteras con orjson
+    ijson = None
+
+# Kernels numba opcionales, activados con TRANSCRIPTOR_JIT=1 (cli.py --jit).
+# La primera ejecución los compila y los guarda en NUMBA_CACHE_DIR.
+np = None
+if os.environ.get('TRANSCRIPTOR_JIT') == '1':
+    os.environ.setdefault(
+        'NUMBA_CACHE_DIR',
+        os.path.join(os.path.expanduser('~'), '.cache', 'transcriptor', 'numba')
+    )
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        np = None
+
+if np is None:
+    # Sin numba los kernels corren como Python normal sobre listas
+    def njit(*args, **kwargs):
+        return lambda func: func
+
+
+class _VerboseBuilder:
+    """
+    Arma una respuesta verbose_json a partir de eventos de ijson
+
+    Solo conserva lo que usan _format_verbose y _unir_chunks (text y
+    start/end/text de cada segmento); tokens, logprobs, etc. se descartan
+    mientras se leen, sin llegar a existir como objetos Python.
+    """
+
+    def __init__(self):
+        self.text = ''
+        self.segments = []
+        self._segment = None
+
+    def feed(self, prefix, event, value):
+        if prefix == 'text' and event == 'string':
+            self.text = value
+        elif prefix == 'segments.item':
+            if event == 'start_map':
+                self._segment = {}
+            elif event == 'end_map':
+                self.segments.append(self._segment)
+        elif prefix in ('segments.item.start', 'segments.item.end'):
+            self._segment[prefix[14:]] = float(value)
+        elif prefix == 'segments.item.text':
+            self._segment['text'] = value
+
+    def result(self):
+        return {'text': self.text, 'segments': self.segments}
+
+
+# Borrado de temporales fuera del camino crítico: el resultado se devuelve
+# sin esperar al unlink (lento con archivos grandes, sobre todo en NTFS)
+_cleanup_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tmpclean')
+atexit.register(_cleanup_pool.shutdown, wait=True)
+
+
+def _borrar_temporal(path):
+    """Borra un temporal; si no se puede (ej: bloqueado en Windows), lo avisa"""
+    try:
+        _silent_unlink(path)
+    except OSError as e:
+        logger.warning(f"⚠️ No se pudo borrar el temporal {path}: {e}")
+
+
+def _borrar_en_segundo_plano(path):
+    """Programa el borrado de path en el hilo de limpieza"""
+    _cleanup_pool.submit(_borrar_temporal, path)
+
+
+@functools.lru_cache(maxsize=1)
+def _console_logging():
+    """
+    Envía los logs del paquete a stderr desde un hilo aparte (una sola vez)
+
+    Los hilos de subida y el event loop solo encolan cada registro; la
+    escritura en la consola la hace el hilo del QueueListener.
+    """
+    log_queue = queue.SimpleQueue()
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    package_logger = logging.getLogger('transcriptor')
+    package_logger.addHandler(QueueHandler(log_queue))
+    # Si la app ya fijó un nivel para el paquete, se respeta
+    if package_logger.level == logging.NOTSET:
+        package_logger.setLevel(logging.INFO)
+
+
+def _retry_delay(attempt, retry_after=None):
+    """
+    Segundos a esperar antes de reintentar una petición a Groq
+
+    Se respeta Retry-After si viene en segundos; si no, backoff exponencial
+    (1, 2, 4... hasta 60s) con jitter para que los chunks no reintenten a la vez.
+    """
+    try:
+        return min(60.0, float(retry_after))
+    except (TypeError, ValueError):
+        return min(60, 2 ** attempt) + random.random()
+
+
+@njit('void(float64[:], int64[:], int64[:])', cache=True)
+def _split_timestamps(seconds, minutes, secs):
+    """Separa cada timestamp en minutos y segundos enteros"""
+    for i in range(len(seconds)):
+        total = int(seconds[i])
+        minutes[i] = total // 60
+        secs[i] = total % 60
+
+
+@njit('int64(float64[:], float64[:], int64[:], float64[:], int64[:])',
+      cache=True, fastmath=True)
+def _merge_overlaps(starts, ends, chunk_ids, boundaries, keep):
+    """
+    Elige los segmentos a conservar al unir chunks solapados
+
+    Cada segmento se queda solo en el chunk cuya zona contiene su punto
+    medio; el chunk k cubre de boundaries[k-1] a boundaries[k] (tiempo
+    global). Escribe en keep los índices conservados y devuelve cuántos son.
+    """
+    last = len(boundaries)
+    count = 0
+    for j in range(len(starts)):
+        k = chunk_ids[j]
+        mid = 0.5 * (starts[j] + ends[j])
+        if (k == 0 or boundaries[k - 1] <= mid) and (k == last or mid < boundaries[k]):
+            keep[count] = j
+            count += 1
+    return count
+
 
 class Transcriptor:
     """
@@ -19,24 +184,80 @@ class Transcriptor:
 
     API_URL = "https://api.groq.com/openai/v1/audio/transcriptions"
     MAX_FILE_SIZE_MB = 25  # Groq limit
+    CHUNK_DURATION = 4 * 60  # 4 minutos por chunk
+    CHUNK_OVERLAP = 15  # Segundos compartidos entre chunks (solo verbose_json)
+    MAX_RETRIES = 5  # Reintentos por petición ante límites de rate o errores 5xx
+    RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+    POOL_SIZE = 8  # Hilos para transcribir_async / transcribir_muchos
 
-    def __init__(self, api_key, default_model='whisper-large-v3-turbo'):
+    def __init__(self, api_key, default_model='whisper-large-v3-turbo',
+                 stream_chunks=False, verbose=False):
         """
         Inicializa el transcriptor
 
         Args:
             api_key (str): API Key de Groq
             default_model (str): Modelo por defecto
+            stream_chunks (bool): Enviar cada chunk desde un pipe de ffmpeg
+                en lugar de escribirlo en disco y releerlo
+            verbose (bool): Mostrar el progreso en stderr (logger
+                'transcriptor' a nivel INFO); si es False esta instancia no
+                emite mensajes de progreso
         """
         if not api_key:
             raise ValueError("API Key es requerida")
 
+        if verbose:
+            _console_logging()
+
         self.api_key = api_key
         self.default_model = default_model
+        self.stream_chunks = stream_chunks
+        self.verbose = verbose
         self.audio_processor = AudioProcessor()
 
+        # Sesión HTTP compartida: reutiliza las conexiones TLS con Groq
+        # entre llamadas (y entre chunks enviados en paralelo)
+        self._session = requests.Session()
+        self._session.mount(
+            'https://',
+            HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=16,
+                # urllib3 no reintenta POST por status (solo fallos de
+                # conexión, antes de enviar el cuerpo)
+                max_retries=Retry(
+                    total=3,
+                    backoff_factor=0.5,
+                    status_forcelist=[429, 500, 502, 503, 504]
+                )
+            )
+        )
+        self._session.headers.update(self._auth_headers())
+
+        # Hilos donde transcribir_async corre las transcripciones completas
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.POOL_SIZE, thread_name_prefix='transcriptor'
+        )
+
+    def close(self):
+        """
+        Libera los hilos y las conexiones HTTP del transcriptor
+
+        Espera a que terminen las transcripciones en curso. También se puede
+        usar como context manager: with Transcriptor(api_key) as trans: ...
+        """
+        self._pool.shutdown(wait=True)
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
     def transcribir(self, archivo, language='es', model=None, prompt='',
-                   format='json', chunk_if_needed=True):
+                   format='json', chunk_if_needed=True, max_concurrency=8):
         """
         Transcribe un archivo de audio o video
 
@@ -47,6 +268,7 @@ class Transcriptor:
             prompt: Prompt opcional para contexto
             format: Formato de salida ('json', 'text', 'verbose_json')
             chunk_if_needed: Si es True, divide archivos grandes automáticamente
+            max_concurrency: Máximo de chunks enviados a la API en paralelo
 
         Returns:
             dict: {
@@ -66,46 +288,216 @@ class Transcriptor:
         model = model or self.default_model
 
         # Manejar diferentes tipos de entrada
-        if isinstance(archivo, str):
-            filepath = Path(archivo)
-            if not filepath.exists():
+        if isinstance(archivo, (str, os.PathLike)):
+            filepath = os.fspath(archivo)
+            if not os.path.exists(filepath):
                 raise FileNotFoundError(f"Archivo no encontrado: {archivo}")
 
             # Procesar archivo
             return self._transcribir_archivo(
-                filepath, language, model, prompt, format, chunk_if_needed
+                filepath, language, model, prompt, format, chunk_if_needed,
+                max_concurrency
             )
 
         else:
             # File-like object (ej: Django/Flask UploadedFile)
             return self._transcribir_fileobject(
-                archivo, language, model, prompt, format
+                archivo, language, model, prompt, format, max_concurrency
+            )
+
+    async def transcribir_async(self, archivo, language='es', model=None, prompt='',
+                                format='json', chunk_if_needed=True, max_concurrency=8):
+        """
+        Versión asíncrona de transcribir, para usar desde un event loop
+
+        La transcripción corre en un hilo del pool del transcriptor, así que
+        ffmpeg y las subidas no bloquean el loop de quien llama (y el envío
+        de chunks puede usar su propio loop en ese hilo).
+
+        Args y Returns: Igual que transcribir()
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool,
+            functools.partial(
+                self.transcribir, archivo, language, model, prompt, format,
+                chunk_if_needed, max_concurrency
             )
+        )
+
+    def transcribir_muchos(self, archivos, max_files=4, **kwargs):
+        """
+        Transcribe varios archivos a la vez (ej: una carpeta de notas de voz)
+
+        Args:
+            archivos: Rutas (o file-like objects) a transcribir
+            max_files: Máximo de archivos en proceso a la vez (hasta
+                POOL_SIZE, los hilos del transcriptor, y hasta max_concurrency)
+            **kwargs: Mismos argumentos que transcribir() (language, model...);
+                max_concurrency es el total de subidas del lote, repartido
+                entre los archivos en proceso
+
+        Returns:
+            list: Un resultado por archivo, en el mismo orden; los que
+                fallan traen la excepción en lugar del dict
+        """
+        return _run_sync(self.transcribir_muchos_async(archivos, max_files, **kwargs))
+
+    async def transcribir_muchos_async(self, archivos, max_files=4, **kwargs):
+        """
+        Versión asíncrona de transcribir_muchos
 
-    def _transcribir_archivo(self, filepath, language, model, prompt, format, chunk_if_needed):
+        Cada archivo que se parte en chunks abre su propia sesión aiohttp
+        con hasta max_concurrency conexiones, así que ese límite se reparte
+        entre los archivos en proceso para acotar las subidas del lote.
+        """
+        # Cada archivo en proceso sube al menos un chunk: tampoco puede
+        # haber más archivos a la vez que subidas permitidas
+        max_concurrency = max(1, kwargs.get('max_concurrency', 8))
+        max_files = max(1, min(max_files, self.POOL_SIZE, max_concurrency))
+        kwargs['max_concurrency'] = max_concurrency // max_files
+        sem = asyncio.Semaphore(max_files)
+
+        async def transcribir_uno(archivo):
+            async with sem:
+                return await self.transcribir_async(archivo, **kwargs)
+
+        return await asyncio.gather(
+            *(transcribir_uno(archivo) for archivo in archivos),
+            return_exceptions=True
+        )
+
+    def _transcribir_archivo(self, filepath, language, model, prompt, format,
+                             chunk_if_needed, max_concurrency):
         """Transcribe un archivo del filesystem"""
 
-        # Convertir video a audio si es necesario
-        if self.audio_processor.is_video(filepath):
-            print(f"🎬 Detectado video, extrayendo audio...")
+        is_video = self.audio_processor.is_video(filepath)
+        if not is_video and not self.audio_processor.is_audio(filepath):
+            # Sin extensión conocida (ej: upload sin nombre, .tmp): decide
+            # el contenido, así un video no se sube entero a Groq
+            info = self.audio_processor.probe(filepath)
+            is_video = bool(info and info['has_video'])
+
+        if is_video:
+            info = self.audio_processor.probe(filepath) or {}
+            spec = info.get('audio_spec') or {}
+            duration = info.get('duration')
+
+            # El audio extraído es WAV 16kHz mono 16 bits (32 KB/s): solo se
+            # parte si con esa duración no cabe en un request
+            needs_chunks = chunk_if_needed and bool(duration) and (
+                duration * 16000 * 2 / (1024 * 1024) > self.MAX_FILE_SIZE_MB
+            )
+
+            if needs_chunks and self.stream_chunks:
+                self._progreso(f"🎬 Detectado video, enviando audio por ventanas...")
+                return self._transcribir_ventanas(
+                    filepath, duration, language, model, prompt, format,
+                    max_concurrency
+                )
+
+            if spec.get('codec_name') in self.audio_processor.REMUX_FORMATS:
+                # El audio ya está en un codec que Groq acepta: copiar la
+                # pista sin recodificar y seguir como un archivo de audio
+                self._progreso(f"🎬 Detectado video, copiando pista de audio...")
+                audio_path = self.audio_processor.remux_audio(filepath)
+                try:
+                    return self._transcribir_audio(
+                        audio_path, language, model, prompt, format,
+                        chunk_if_needed, max_concurrency, duration=duration
+                    )
+                finally:
+                    _borrar_en_segundo_plano(audio_path)
+
+            if needs_chunks:
+                # Extraer audio y dividir en una sola pasada de ffmpeg
+                self._progreso(f"🎬 Detectado video, extrayendo audio en chunks...")
+                with tempfile.TemporaryDirectory(prefix='transcriptor_') as tmpdir:
+                    chunks = self.audio_processor.extract_and_chunk_async(
+                        filepath,
+                        chunk_duration=self.CHUNK_DURATION,
+                        overlap=self._overlap(format),
+                        duration=duration,
+                        tmpdir=tmpdir
+                    )
+                    return self._transcribir_chunks(
+                        chunks, duration, language, model, prompt, format,
+                        max_concurrency
+                    )
+
+            self._progreso(f"🎬 Detectado video, extrayendo audio...")
             audio_path = self.audio_processor.extract_audio(filepath)
-        else:
-            audio_path = filepath
+            try:
+                return self._transcribir_audio(
+                    audio_path, language, model, prompt, format,
+                    chunk_if_needed, max_concurrency, duration=duration
+                )
+            finally:
+                _borrar_en_segundo_plano(audio_path)
 
-        # Obtener duración
-        duration = self.audio_processor.get_duration(audio_path)
+        return self._transcribir_audio(
+            filepath, language, model, prompt, format,
+            chunk_if_needed, max_concurrency
+        )
+
+    def _transcribir_audio(self, audio_path, language, model, prompt, format,
+                           chunk_if_needed, max_concurrency, duration=None):
+        """Transcribe un archivo de audio, dividiéndolo si supera el límite de Groq"""
+
+        # Un solo stat: sirve para el tamaño y para la clave del cache de ffprobe
+        st = os.stat(audio_path)
 
         # Verificar tamaño
-        size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+        size_mb = st.st_size / (1024 * 1024)
 
         if size_mb > self.MAX_FILE_SIZE_MB and chunk_if_needed:
-            print(f"📦 Archivo grande ({size_mb:.1f}MB), dividiendo en chunks...")
-            return self._transcribir_chunks(
-                audio_path, duration, language, model, prompt, format
-            )
+            self._progreso(f"📦 Archivo grande ({size_mb:.1f}MB), dividiendo en chunks...")
+            if duration is None:
+                duration = self.audio_processor.peek_duration(audio_path, st)
 
-        # Transcribir archivo completo
-        text = self._call_api(audio_path, language, model, prompt, format)
+            if self.stream_chunks:
+                # Las ventanas necesitan la duración antes de empezar
+                if duration is None:
+                    duration = self.audio_processor.get_duration(audio_path, st)
+                if duration:
+                    return self._transcribir_ventanas(
+                        audio_path, duration, language, model, prompt, format,
+                        max_concurrency
+                    )
+
+            # Si no se conoce, la duración sale de la misma pasada de ffmpeg
+            # que corta los chunks (o de ffprobe, si se corta con overlap)
+            info = {}
+            with tempfile.TemporaryDirectory(prefix='transcriptor_') as tmpdir:
+                chunks = self.audio_processor.create_chunks_async(
+                    audio_path,
+                    chunk_duration=self.CHUNK_DURATION,
+                    overlap=self._overlap(format),
+                    duration=duration,
+                    tmpdir=tmpdir,
+                    info=info
+                )
+                result = self._transcribir_chunks(
+                    chunks, duration, language, model, prompt, format,
+                    max_concurrency
+                )
+            result['duration'] = info['duration']
+            return result
+
+        # Cabe en un solo request: se sube tal cual. La duración solo va en
+        # el resultado, así que ffprobe corre (como proceso, sin hilo extra)
+        # mientras se sube el archivo
+        pending = (
+            contextlib.nullcontext(lambda: duration) if duration is not None
+            else self.audio_processor.duration_in_background(audio_path, st)
+        )
+        with pending as get_duration:
+            text = self._call_api(
+                audio_path,
+                self._form_data(language, model, prompt, format),
+                self._parser(format)
+            )
+            duration = get_duration()
 
         return {
             'text': text,
@@ -116,14 +508,20 @@ class Transcriptor:
             'chunks': 1
         }
 
-    def _transcribir_fileobject(self, fileobj, language, model, prompt, format):
+    def _transcribir_fileobject(self, fileobj, language, model, prompt, format,
+                                max_concurrency):
         """Transcribe un file-like object (ej: request.FILES['audio'])"""
 
+        # Conservar la extensión original: Groq la usa para validar el formato
+        # (Flask: .filename, Django: .name)
+        name = getattr(fileobj, 'filename', None) or getattr(fileobj, 'name', None)
+        suffix = os.path.splitext(name)[1] if isinstance(name, str) else ''
+
         # Guardar temporalmente
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.tmp') as tmp:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix or '.tmp') as tmp:
             # Leer del file object
             if hasattr(fileobj, 'read'):
-                tmp.write(fileobj.read())
+                self._copiar(fileobj, tmp)
             elif hasattr(fileobj, 'file'):
                 # Django UploadedFile
                 for chunk in fileobj.chunks():
@@ -136,123 +534,433 @@ class Transcriptor:
         try:
             # Transcribir archivo temporal
             result = self._transcribir_archivo(
-                Path(tmp_path), language, model, prompt, format, chunk_if_needed=True
+                tmp_path, language, model, prompt, format,
+                chunk_if_needed=True, max_concurrency=max_concurrency
             )
             return result
 
         finally:
             # Limpiar temporal
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            _borrar_en_segundo_plano(tmp_path)
 
-    def _transcribir_chunks(self, audio_path, duration, language, model, prompt, format):
-        """Divide el audio en chunks y transcribe cada uno"""
+    def _copiar(self, src, dst):
+        """
+        Copia el file object src en dst por bloques, sin cargarlo entero en memoria
 
-        chunk_duration = 4 * 60  # 4 minutos por chunk
-        chunks = self.audio_processor.create_chunks(
-            audio_path,
-            chunk_duration=chunk_duration
-        )
+        Si src es un archivo real del disco (ej: upload ya volcado a un
+        temporal) la copia la hace el kernel con os.sendfile. Si no tiene
+        descriptor (ej: BytesIO) se copia con shutil.copyfileobj; un
+        SpooledTemporaryFile aún en memoria se vuelca a disco al pedir
+        fileno(), pero es pequeño por definición.
+        """
+        fd = None
+        if hasattr(os, 'sendfile'):
+            try:
+                fd = src.fileno()
+                start = offset = src.tell()
+                size = os.fstat(fd).st_size
+            except (AttributeError, OSError, io.UnsupportedOperation):
+                # Sin descriptor real (ej: BytesIO)
+                fd = None
+
+        if fd is not None:
+            try:
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), fd, offset, size - offset)
+                    if not sent:
+                        break
+                    offset += sent
+                src.seek(offset)
+                return
+            except OSError:
+                # SO sin sendfile entre archivos (macOS): copia normal,
+                # salvo que ya se haya escrito parte
+                if offset != start:
+                    raise
+
+        shutil.copyfileobj(src, dst, 1 << 20)
+
+    def _transcribir_chunks(self, chunks, duration, language, model, prompt,
+                            format, max_concurrency):
+        """
+        Transcribe los chunks en paralelo y une los textos
+
+        Args:
+            chunks: Async iterable de (índice, ruta), como el que devuelve
+                AudioProcessor.create_chunks_async
+
+        Los chunks viven en un TemporaryDirectory del llamador, que los
+        elimina todos juntos al salir del bloque with.
+        """
+        return _run_sync(self._transcribir_chunks_async(
+            chunks, duration, language, model, prompt, format, max_concurrency
+        ))
+
+    async def _transcribir_chunks_async(self, chunks, duration, language, model,
+                                        prompt, format, max_concurrency):
+        """
+        Versión asíncrona de _transcribir_chunks
+
+        Todas las peticiones comparten una ClientSession; el semáforo limita
+        cuántas hay en vuelo a la vez (límites de rate de Groq). Cada chunk
+        se envía apenas ffmpeg lo termina, sin esperar a que se corten todos.
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+
+        # Mismos campos para todos los chunks: se arman una sola vez
+        form = self._form_data(language, model, prompt, format)
 
-        texts = []
-        for i, chunk_path in enumerate(chunks, 1):
-            print(f"   Procesando chunk {i}/{len(chunks)}...")
-            text = self._call_api(chunk_path, language, model, prompt, format)
-            texts.append(text)
+        async def transcribir_chunk(session, i, chunk_path):
+            async with sem:
+                self._progreso(f"   Procesando chunk {i + 1}...")
+                return i, await self._call_api_async(session, chunk_path, form)
 
-            # Limpiar chunk temporal
-            if os.path.exists(chunk_path):
-                os.remove(chunk_path)
+        timeout = aiohttp.ClientTimeout(total=600)
+        connector = aiohttp.TCPConnector(limit=max_concurrency, keepalive_timeout=60)
+        async with aiohttp.ClientSession(
+            timeout=timeout, connector=connector, headers=self._auth_headers()
+        ) as session:
+            tasks = []
+            try:
+                async for i, chunk_path in chunks:
+                    tasks.append(asyncio.ensure_future(
+                        transcribir_chunk(session, i, chunk_path)
+                    ))
+                indexed = await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
 
-        # Unir textos
-        full_text = '\n\n'.join(texts)
+        # Se ordena en el sitio y se une desde un generador, sin armar
+        # otra lista con todas las respuestas
+        indexed.sort(key=itemgetter(0))
+        text = self._unir_chunks((result for _, result in indexed), format)
 
         return {
-            'text': full_text,
+            'text': text,
+            'language': language,
+            'duration': duration,
+            'success': True,
+            'model': model,
+            'chunks': len(indexed)
+        }
+
+    def _transcribir_ventanas(self, source, duration, language, model, prompt,
+                              format, max_concurrency):
+        """Transcribe source por ventanas enviadas desde pipes de ffmpeg"""
+
+        windows = self.audio_processor.chunk_windows(
+            duration, self.CHUNK_DURATION, self._overlap(format)
+        )
+        form = self._form_data(language, model, prompt, format)
+
+        def transcribir_ventana(item):
+            i, (start, length) = item
+            self._progreso(f"   Procesando chunk {i}/{len(windows)}...")
+            with self.audio_processor.stream_chunk(source, start, length) as pipe:
+                return self._call_api_fileobj(pipe, f'chunk_{i:04d}.wav', form)
+
+        # map conserva el orden de las ventanas
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = list(executor.map(transcribir_ventana, enumerate(windows, 1)))
+
+        return {
+            'text': self._unir_chunks(results, format),
             'language': language,
             'duration': duration,
             'success': True,
             'model': model,
-            'chunks': len(chunks)
+            'chunks': len(windows)
         }
 
-    def _call_api(self, filepath, language, model, prompt, format):
+    def _overlap(self, format):
+        """
+        Segundos de overlap entre chunks para un formato de respuesta
+
+        Solo verbose_json tiene timestamps para descartar lo repetido en la
+        zona compartida (_unir_chunks); en el resto el overlap duplicaría
+        texto, así que se corta sin él: un solo ffmpeg con el segment muxer
+        en lugar de uno por ventana.
+        """
+        return self.CHUNK_OVERLAP if format == 'verbose_json' else 0
+
+    def _unir_chunks(self, results, format):
+        """
+        Une las respuestas crudas de chunks consecutivos (_call_api sin parse)
+
+        results puede ser cualquier iterable (se recorre una sola vez).
+
+        En verbose_json los segmentos se pasan a tiempo global y se descartan
+        los repetidos en las zonas de overlap; en el resto se unen los textos.
+        """
+        if format != 'verbose_json':
+            return '\n\n'.join(result.get('text', '') for result in results)
+
+        overlap = self._overlap(format)
+        step = self.CHUNK_DURATION - overlap
+
+        segments = []
+        chunk_ids = []
+        num_chunks = 0
+        for k, result in enumerate(results):
+            num_chunks = k + 1
+            offset = k * step
+            for segment in result.get('segments', []):
+                segments.append(dict(
+                    segment,
+                    start=segment.get('start', 0) + offset,
+                    end=segment.get('end', 0) + offset
+                ))
+                chunk_ids.append(k)
+
+        # Corte entre chunks k y k+1: mitad de la zona compartida
+        boundaries = [
+            (k + 1) * step + overlap / 2
+            for k in range(num_chunks - 1)
+        ]
+        starts = [float(segment['start']) for segment in segments]
+        ends = [float(segment['end']) for segment in segments]
+
+        if np is not None:
+            starts = np.array(starts, dtype=np.float64)
+            ends = np.array(ends, dtype=np.float64)
+            chunk_ids = np.array(chunk_ids, dtype=np.int64)
+            boundaries = np.array(boundaries, dtype=np.float64)
+            keep = np.empty(len(segments), dtype=np.int64)
+        else:
+            keep = [0] * len(segments)
+
+        count = _merge_overlaps(starts, ends, chunk_ids, boundaries, keep)
+        merged = [segments[j] for j in keep[:count]]
+
+        return self._format_verbose({
+            'text': ' '.join(segment.get('text', '').strip() for segment in merged),
+            'segments': merged
+        })
+
+    def _call_api(self, filepath, form, parse=None):
         """
         Llama a la API de Groq para transcribir
 
+        Args:
+            filepath: Ruta del audio
+            form: Campos del formulario, de _form_data (se arman una vez
+                por transcripción y se reusan en todos los chunks)
+            parse: Función que convierte la respuesta JSON (ver _parser);
+                si es None se devuelve la respuesta sin formatear
+
         Returns:
-            str: Texto transcrito
+            str: Texto transcrito (dict si parse es None)
 
         Raises:
             Exception: Si hay error en la API
         """
         with open(filepath, 'rb') as audio_file:
-            files = {
-                'file': (os.path.basename(filepath), audio_file, 'audio/mpeg')
-            }
-
-            data = {
-                'model': model,
-                'response_format': format
-            }
+            return self._call_api_fileobj(
+                audio_file, os.path.basename(filepath), form, parse
+            )
 
-            if language and language != 'auto':
-                data['language'] = language
+    def _call_api_fileobj(self, audio_file, filename, form, parse=None):
+        """
+        Envía a Groq el audio leído de un file-like object
 
-            if prompt:
-                data['prompt'] = prompt
+        Ante 429/5xx se reintenta (ver _retry_delay) rebobinando el archivo;
+        los pipes de ffmpeg no se pueden rebobinar y se envían una sola vez.
+        """
+        retryable = audio_file.seekable()
+        start = audio_file.tell() if retryable else 0
+        attempts = self.MAX_RETRIES + 1 if retryable else 1
+        stream = self._stream_verbose(form)
 
-            headers = {
-                'Authorization': f'Bearer {self.api_key}'
-            }
+        for attempt in range(attempts):
+            if attempt:
+                audio_file.seek(start)
 
-            response = requests.post(
-                self.API_URL,
-                files=files,
-                data=data,
-                headers=headers,
-                timeout=600
-            )
+            response = self._post(audio_file, filename, form, stream)
 
-        if response.status_code == 200:
-            result = response.json()
+            if response.status_code == 200:
+                if stream:
+                    # Se parsea mientras llega, sin cargar el JSON completo
+                    response.raw.decode_content = True
+                    builder = _VerboseBuilder()
+                    for event in ijson.parse(response.raw):
+                        builder.feed(*event)
+                    result = builder.result()
+                else:
+                    # orjson directo sobre los bytes: más rápido que response.json()
+                    result = orjson.loads(response.content)
+                return result if parse is None else parse(result)
 
-            if format == 'verbose_json':
-                # Devolver formato estructurado
-                return self._format_verbose(result)
-            else:
-                return result.get('text', '')
+            if response.status_code in self.RETRY_STATUS and attempt + 1 < attempts:
+                delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+                logger.warning(
+                    f"⚠️ Groq respondió {response.status_code}, "
+                    f"reintentando en {delay:.1f}s..."
+                )
+                time.sleep(delay)
+                continue
 
-        else:
             raise Exception(
                 f'Error de API Groq: {response.status_code} - {response.text}'
             )
 
+    def _post(self, audio_file, filename, form, stream=False):
+        """Un intento de envío a Groq con requests"""
+
+        data = form
+        headers = {}
+
+        if audio_file.seekable():
+            # El encoder lee el archivo por bloques mientras se envía:
+            # el cuerpo multipart nunca se arma entero en memoria
+            data = MultipartEncoder(fields={
+                **data,
+                'file': (filename, audio_file, 'audio/mpeg')
+            })
+            headers['Content-Type'] = data.content_type
+            files = None
+        else:
+            # Pipes de ffmpeg: sin tamaño conocido, requests arma el cuerpo
+            files = {
+                'file': (filename, audio_file, 'audio/mpeg')
+            }
+
+        return self._session.post(
+            self.API_URL,
+            files=files,
+            data=data,
+            headers=headers,
+            stream=stream,
+            timeout=600
+        )
+
+    def _stream_verbose(self, form):
+        """Si la respuesta se parsea en streaming con ijson (solo verbose_json)"""
+        return ijson is not None and form.get('response_format') == 'verbose_json'
+
+    async def _call_api_async(self, session, filepath, form, parse=None):
+        """
+        Versión asíncrona de _call_api sobre una aiohttp.ClientSession
+
+        Raises:
+            Exception: Si hay error en la API
+        """
+        attempts = self.MAX_RETRIES + 1
+        stream = self._stream_verbose(form)
+
+        for attempt in range(attempts):
+            # aiohttp cierra el archivo al enviarlo: FormData y archivo
+            # nuevos en cada intento
+            data = aiohttp.FormData()
+            for name, value in form.items():
+                data.add_field(name, value)
+
+            with open(filepath, 'rb') as audio_file:
+                data.add_field(
+                    'file', audio_file,
+                    filename=os.path.basename(filepath),
+                    content_type='audio/mpeg'
+                )
+
+                async with session.post(self.API_URL, data=data) as response:
+                    if response.status == 200:
+                        if stream:
+                            builder = _VerboseBuilder()
+                            async for event in ijson.parse_async(response.content):
+                                builder.feed(*event)
+                            result = builder.result()
+                        else:
+                            result = orjson.loads(await response.read())
+                        return result if parse is None else parse(result)
+
+                    if response.status in self.RETRY_STATUS and attempt + 1 < attempts:
+                        delay = _retry_delay(attempt, response.headers.get('Retry-After'))
+                        logger.warning(
+                            f"⚠️ Groq respondió {response.status}, "
+                            f"reintentando en {delay:.1f}s..."
+                        )
+                    else:
+                        raise Exception(
+                            f'Error de API Groq: {response.status} - {await response.text()}'
+                        )
+
+            # Esperar fuera del with: la conexión vuelve al pool mientras tanto
+            await asyncio.sleep(delay)
+
+    def _progreso(self, msg):
+        """Mensaje de progreso, solo si esta instancia es verbose"""
+        if self.verbose:
+            logger.info(msg)
+
+    def _auth_headers(self):
+        """Headers comunes a todas las peticiones a Groq"""
+        return {
+            'Authorization': f'Bearer {self.api_key}'
+        }
+
+    def _form_data(self, language, model, prompt, format):
+        """Campos del formulario multipart (sin el archivo)"""
+        data = {
+            'model': model,
+            'response_format': format
+        }
+
+        if language and language != 'auto':
+            data['language'] = language
+
+        if prompt:
+            data['prompt'] = prompt
+
+        return data
+
+    def _parser(self, format):
+        """Función que convierte la respuesta JSON de Groq según el formato"""
+        if format == 'verbose_json':
+            # Devolver formato estructurado
+            return self._format_verbose
+        return methodcaller('get', 'text', '')
+
     def _format_verbose(self, result):
         """Formatea respuesta verbose con timestamps"""
-        output = []
-        output.append("=== TRANSCRIPCIÓN COMPLETA ===\n")
-        output.append(result.get('text', ''))
-        output.append("\n\n=== SEGMENTOS CON TIMESTAMPS ===\n")
-
         segments = result.get('segments', [])
-        for segment in segments:
-            start = segment.get('start', 0)
-            end = segment.get('end', 0)
-            text = segment.get('text', '').strip()
-
-            start_min = int(start // 60)
-            start_sec = int(start % 60)
-            end_min = int(end // 60)
-            end_sec = int(end % 60)
-
-            output.append(
-                f"[{start_min:02d}:{start_sec:02d} - {end_min:02d}:{end_sec:02d}] {text}"
-            )
 
-        return "\n".join(output)
+        # Inicio y fin de cada segmento intercalados: [s0, e0, s1, e1, ...]
+        stamps = [
+            float(value)
+            for segment in segments
+            for value in (segment.get('start', 0), segment.get('end', 0))
+        ]
+        if np is not None:
+            stamps = np.array(stamps, dtype=np.float64)
+            minutes = np.empty(len(stamps), dtype=np.int64)
+            secs = np.empty(len(stamps), dtype=np.int64)
+        else:
+            minutes = [0] * len(stamps)
+            secs = [0] * len(stamps)
+
+        _split_timestamps(stamps, minutes, secs)
+
+        if np is not None:
+            minutes = minutes.tolist()
+            secs = secs.tolist()
+
+        # Una línea por segmento; s y s + 1 son su inicio y fin en stamps
+        lines = [
+            f"[{minutes[s]:02d}:{secs[s]:02d} - {minutes[s + 1]:02d}:{secs[s + 1]:02d}] "
+            f"{segment.get('text', '').strip()}"
+            for s, segment in zip(range(0, len(stamps), 2), segments)
+        ]
+
+        return "\n".join((
+            "=== TRANSCRIPCIÓN COMPLETA ===\n",
+            result.get('text', ''),
+            "\n\n=== SEGMENTOS CON TIMESTAMPS ===\n",
+            *lines
+        ))
 
-    def transcribir_url(self, url, language='es', model=None, prompt=''):
+    def transcribir_url(self, url, language='es', model=None, prompt='',
+                        download_connections=1):
         """
         Transcribe audio desde una URL
 
@@ -261,21 +969,102 @@ class Transcriptor:
             language: Código de idioma
             model: Modelo a usar
             prompt: Prompt opcional
+            download_connections: Conexiones paralelas para la descarga
+                (por rangos HTTP, si el servidor los admite)
 
         Returns:
             dict: Resultado de transcripción
         """
-        # Descargar archivo temporalmente
-        import urllib.request
-
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.tmp') as tmp:
-            print(f"📥 Descargando desde {url}...")
-            urllib.request.urlretrieve(url, tmp.name)
-            tmp_path = tmp.name
+        self._progreso(f"📥 Descargando desde {url}...")
+        tmp_path = self._descargar(url, download_connections)
 
         try:
             result = self.transcribir(tmp_path, language, model, prompt)
             return result
         finally:
-            if os.path.exists(tmp_path):
-                os.remove(tmp_path)
+            _borrar_en_segundo_plano(tmp_path)
+
+    def _descargar(self, url, connections=1):
+        """
+        Descarga url a un archivo temporal, por bloques y sin cargarlo en memoria
+
+        Returns:
+            str: Ruta del archivo descargado (queda a cargo de quien llama)
+
+        Raises:
+            Exception: Si el servidor responde con error
+        """
+        # La API key de Groq no debe viajar a servidores de terceros
+        no_auth = {'Authorization': None}
+
+        if connections > 1:
+            head = self._session.head(
+                url, headers=no_auth, allow_redirects=True, timeout=60
+            )
+            size = int(head.headers.get('Content-Length') or 0)
+
+            if head.ok and size and head.headers.get('Accept-Ranges') == 'bytes':
+                tmp_path = self._temp_descarga(url, head.headers)
+                try:
+                    _run_sync(self._descargar_rangos(head.url, tmp_path, size, connections))
+                except BaseException:
+                    _borrar_en_segundo_plano(tmp_path)
+                    raise
+                return tmp_path
+
+        with self._session.get(url, headers=no_auth, stream=True, timeout=600) as response:
+            if not response.ok:
+                raise Exception(f'Error descargando {url}: {response.status_code}')
+
+            tmp_path = self._temp_descarga(url, response.headers)
+            try:
+                with open(tmp_path, 'wb') as tmp:
+                    for block in response.iter_content(chunk_size=1 << 20):
+                        tmp.write(block)
+            except BaseException:
+                _borrar_en_segundo_plano(tmp_path)
+                raise
+
+        return tmp_path
+
+    async def _descargar_rangos(self, url, path, size, connections):
+        """Descarga path en `connections` rangos paralelos, cada uno en su offset"""
+        with open(path, 'wb') as tmp:
+            tmp.truncate(size)
+
+        part = -(-size // connections)
+
+        timeout = aiohttp.ClientTimeout(total=600)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+
+            async def descargar_rango(start):
+                end = min(start + part, size) - 1
+                headers = {'Range': f'bytes={start}-{end}'}
+                async with session.get(url, headers=headers) as response:
+                    if response.status != 206:
+                        raise Exception(f'Error descargando {url}: {response.status}')
+
+                    with open(path, 'r+b') as tmp:
+                        tmp.seek(start)
+                        async for block in response.content.iter_chunked(1 << 20):
+                            tmp.write(block)
+
+            await asyncio.gather(*(
+                descargar_rango(start) for start in range(0, size, part)
+            ))
+
+    def _temp_descarga(self, url, headers):
+        """
+        Crea el archivo temporal de una descarga
+
+        El sufijo sale de la URL o del Content-Type, para que is_video y
+        ffmpeg reconozcan el formato sin tener que adivinarlo.
+        """
+        suffix = os.path.splitext(urlsplit(url).path)[1].lower()
+        known = self.audio_processor.VIDEO_EXTENSIONS | self.audio_processor.AUDIO_EXTENSIONS
+        if suffix not in known:
+            content_type = headers.get('Content-Type', '').split(';')[0].strip()
+            suffix = mimetypes.guess_extension(content_type) or '.tmp'
+
+        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+            return tmp.name